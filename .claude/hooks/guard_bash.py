@@ -3,6 +3,11 @@ import json
 import re
 import sys
 
+try:
+    import hyperscan  # optional (Linux/macOS wheels): all rules in one automaton pass
+except ImportError:
+    hyperscan = None
+
 # Hard blocks: things that can wipe disks, exfiltrate, or execute remote code
 BLOCK_RULES = [
     (r"\brm\s+-rf\s+/(?:\s|$)", "Blocked: destructive delete of root filesystem."),
@@ -26,6 +31,75 @@ SECRET_PATH_RULES = [
     (r"(?i)\b(cat|type|more|less)\b.*\b\.pem\b", "Blocked: reading PEM key/cert via shell command."),
 ]
 
+ALL_RULES = BLOCK_RULES + SECRET_PATH_RULES
+
+# Every rule needs one of these substrings (case-insensitively) to match; a command
+# containing none of them can't be blocked, so skip the regex work entirely
+FAST_KEYS = (
+    "rm", "mkfs", "dd", "shutdown", "reboot", "sudo", "chmod", "curl", "wget",
+    "invoke-expression", "iex", "iwr", ".env", "secret", "id_rsa", "id_ed25519", ".pem",
+)
+
+# Read-only commands that can't start another program or read arbitrary files.
+# Only trusted when the command is a single simple command (no metacharacters below).
+SAFE_PREFIXES = {
+    tuple(p.split())
+    for p in ("ls", "pwd", "echo", "git status", "git diff", "git log", "git rev-parse", "node -v", "npm -v", "npx tsc")
+}
+SHELL_METACHARS = ("|", ";", "&", "`", "$(", ">", "<", "\n")
+
+def _bare(pat: str) -> str:
+    # Inline (?i) is only legal at the start of a whole pattern; IGNORECASE is applied globally anyway
+    return pat[4:] if pat.startswith("(?i)") else pat
+
+# Compiled once at import instead of going through re's cache for every rule on every Bash call
+COMPILED_RULES = [(re.compile(_bare(pat), re.IGNORECASE), msg) for pat, msg in ALL_RULES]
+
+# Single alternation of every rule: one scan settles the common no-match case
+ANY_RULE_RE = re.compile("|".join(f"(?:{_bare(pat)})" for pat, _ in ALL_RULES), re.IGNORECASE)
+
+def _build_hs_db():
+    if hyperscan is None:
+        return None
+    # UTF8|UCP keeps \s, \w and \b Unicode-aware, matching re on str
+    flag = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[_bare(pat).encode() for pat, _ in ALL_RULES],
+            ids=list(range(len(ALL_RULES))),
+            flags=[flag] * len(ALL_RULES),
+        )
+        return db
+    except Exception:
+        return None  # a pattern Hyperscan can't compile: stay on re
+
+HS_DB = _build_hs_db()
+
+def is_obviously_safe(cmd: str) -> bool:
+    # Non-ASCII text goes the long way: re's IGNORECASE folds e.g. U+017F to "s", str.lower() doesn't
+    if cmd.isascii():
+        low = cmd.lower()
+        if not any(k in low for k in FAST_KEYS):
+            return True
+    if any(c in cmd for c in SHELL_METACHARS):
+        return False
+    words = cmd.split()
+    return tuple(words[:1]) in SAFE_PREFIXES or tuple(words[:2]) in SAFE_PREFIXES
+
+def matching_rules(cmd: str) -> list[str]:
+    """Messages of every rule that matches cmd, in rule order."""
+    if HS_DB is not None:
+        try:
+            hits = set()
+            HS_DB.scan(cmd.encode("utf-8"), match_event_handler=lambda rule_id, *_: hits.add(rule_id))
+            return [ALL_RULES[i][1] for i in sorted(hits)]
+        except Exception:
+            pass  # e.g. lone surrogates that can't be encoded; re handles them
+    if not ANY_RULE_RE.search(cmd):
+        return []
+    return [msg for rx, msg in COMPILED_RULES if rx.search(cmd)]
+
 def main() -> int:
     try:
         data = json.load(sys.stdin)
@@ -41,14 +115,10 @@ def main() -> int:
     if tool_name != "Bash" or not cmd.strip():
         return 0
 
-    problems = []
-    for pat, msg in BLOCK_RULES:
-        if re.search(pat, cmd, flags=re.IGNORECASE):
-            problems.append(msg)
+    if is_obviously_safe(cmd):
+        return 0
 
-    for pat, msg in SECRET_PATH_RULES:
-        if re.search(pat, cmd, flags=re.IGNORECASE):
-            problems.append(msg)
+    problems = matching_rules(cmd)
 
     if problems:
         for p in problems:
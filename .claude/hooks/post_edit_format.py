@@ -3,6 +3,12 @@ import json
 import os
 import subprocess
 import sys
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, format each file directly
+    fcntl = None
 
 # Keep this conservative to avoid formatting generated folders
 IGNORE_PREFIXES = (
@@ -19,8 +25,109 @@ FORMAT_EXTS = {
     ".ts", ".tsx", ".js", ".jsx", ".json", ".md", ".css", ".scss", ".html", ".yml", ".yaml",
 }
 
+# Edits arriving in a burst are queued and formatted by one prettier run; whichever hook
+# call creates FLUSH_LOCK drains the queue, the rest just append to it and return
+FMT_QUEUE = os.path.join(".claude", "cache", "format_queue.txt")
+FLUSH_LOCK = os.path.join(".claude", "cache", "format_flush.lock")
+DEBOUNCE_SECONDS = 0.15
+# A flusher can't legitimately hold the lock longer than one prettier timeout
+STALE_LOCK_SECONDS = 150
+
+_prettier_cmds = {}
+
 def run(cmd, cwd, timeout=120):
-    return subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=timeout)
+    # prettier --write only lists file names on stdout; keep the raw stderr and decode the part we print
+    r = subprocess.run(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=timeout)
+    r.stderr = r.stderr[:4096].decode("utf-8", errors="replace")
+    return r
+
+def prettier_cmd(project_dir: str) -> list[str]:
+    # Call node_modules/.bin/prettier directly; npx boots an extra Node process just to resolve it
+    if project_dir not in _prettier_cmds:
+        names = ("prettier.cmd", "prettier") if os.name == "nt" else ("prettier",)
+        cmd = ["npx", "prettier"]
+        for name in names:
+            local_bin = os.path.join(project_dir, "node_modules", ".bin", name)
+            if os.path.isfile(local_bin):
+                cmd = [local_bin]
+                break
+        _prettier_cmds[project_dir] = cmd
+    return _prettier_cmds[project_dir]
+
+def enqueue(project_dir: str, rel_path: str) -> None:
+    path = os.path.join(project_dir, FMT_QUEUE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.write(rel_path + "\n")
+
+def take_queue(project_dir: str) -> list[str]:
+    """Empty the queue and return its paths, deduplicated, in first-queued order."""
+    path = os.path.join(project_dir, FMT_QUEUE)
+    try:
+        with open(path, "r+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            lines = f.read().splitlines()
+            f.seek(0)
+            f.truncate()
+    except OSError:
+        return []
+    return list(dict.fromkeys(line for line in lines if line))
+
+def acquire_flush_lock(project_dir: str) -> bool:
+    path = os.path.join(project_dir, FLUSH_LOCK)
+    for _ in range(2):
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            # Left behind by a flusher that was killed mid-run; clear it and retry once
+            try:
+                if time.time() - os.stat(path).st_mtime < STALE_LOCK_SECONDS:
+                    return False
+                os.unlink(path)
+            except OSError:
+                pass
+        except OSError:
+            return False
+    return False
+
+def release_flush_lock(project_dir: str) -> None:
+    try:
+        os.unlink(os.path.join(project_dir, FLUSH_LOCK))
+    except OSError:
+        pass
+
+def format_files(project_dir: str, rel_paths: list[str]) -> None:
+    # Prettier format only the touched files (NOT the whole repo)
+    try:
+        r = run(prettier_cmd(project_dir) + ["--write", *rel_paths], cwd=project_dir, timeout=120)
+    except Exception as e:
+        print(f"post_edit_format: prettier failed to run: {e}", file=sys.stderr)
+        return
+
+    # If prettier failed, surface in stderr but don't block (PostToolUse happens after the tool ran anyway)
+    if r.returncode != 0 and r.stderr.strip():
+        print(r.stderr.strip(), file=sys.stderr)
+
+def flush(project_dir: str) -> None:
+    while acquire_flush_lock(project_dir):
+        try:
+            # Drain until a debounce window passes with nothing new queued
+            while True:
+                time.sleep(DEBOUNCE_SECONDS)
+                rel_paths = take_queue(project_dir)
+                if not rel_paths:
+                    break
+                format_files(project_dir, rel_paths)
+        finally:
+            release_flush_lock(project_dir)
+        # Something queued between our last drain and the unlock would otherwise wait for the next edit
+        try:
+            if os.path.getsize(os.path.join(project_dir, FMT_QUEUE)) == 0:
+                return
+        except OSError:
+            return
 
 def main() -> int:
     project_dir = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
@@ -43,17 +150,17 @@ def main() -> int:
     if ext.lower() not in FORMAT_EXTS:
         return 0
 
-    # Prettier format only the touched file (NOT the whole repo)
-    try:
-        r = run(["npx", "prettier", "--write", rel_path], cwd=project_dir, timeout=120)
-    except Exception as e:
-        print(f"post_edit_format: prettier failed to run: {e}", file=sys.stderr)
+    if fcntl is None:
+        format_files(project_dir, [rel_path])
         return 0
 
-    # If prettier failed, surface in stderr but don't block (PostToolUse happens after the tool ran anyway)
-    if r.returncode != 0 and r.stderr.strip():
-        print(r.stderr.strip(), file=sys.stderr)
+    try:
+        enqueue(project_dir, rel_path)
+    except OSError:
+        format_files(project_dir, [rel_path])
+        return 0
 
+    flush(project_dir)
     return 0
 
 if __name__ == "__main__":
@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
+import functools
 import json
 import os
+import signal
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
+
+try:
+    import pygit2  # optional: reads the index in-process instead of spawning git
+except ImportError:
+    pygit2 = None
 
 # Only run heavier checks if code changed in these areas
 TEST_RELEVANT_PREFIXES = (
@@ -15,86 +25,220 @@ TEST_RELEVANT_PREFIXES = (
     "prisma/",
 )
 
+# Typecheck/lint only see JS/TS sources (plus the configs that change how they're read);
+# a diff of docs, YAML or the Prisma schema alone skips both Node spawns
+CODE_EXTS = (".ts", ".tsx", ".js", ".jsx", ".cts", ".mts", ".cjs", ".mjs")
+TYPECHECK_CONFIGS = ("tsconfig.json", "package.json")
+LINT_CONFIGS = ("eslint.config.mjs", "eslint.config.js", ".eslintrc.json", ".eslintrc.js", "package.json")
+
+# Failure reports only show the first 2000 chars of stderr; keep a little headroom
+STDERR_CAP = 8192
+
+# Small JSON snapshots shared between Stop hook processes (git-ignored)
+CACHE_DIR = Path(".claude") / "cache"
+
+def read_cache(project_dir: Path, name: str) -> dict:
+    try:
+        return json.loads((project_dir / CACHE_DIR / name).read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def write_cache(project_dir: Path, name: str, data: dict) -> None:
+    path = project_dir / CACHE_DIR / name
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data), encoding="utf-8")
+    except OSError:
+        pass
+
 def run(cmd, cwd, timeout=900):
-    return subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=timeout)
-
-def detect_pm(project_dir: Path) -> list[str]:
-    if (project_dir / "pnpm-lock.yaml").exists():
-        return ["pnpm"]
-    if (project_dir / "yarn.lock").exists():
-        return ["yarn"]
-    if (project_dir / "bun.lockb").exists():
-        return ["bun"]
+    # Bytes out: callers decode only what they use (git's stderr goes unread)
+    return subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=timeout)
+
+def run_check(cmd, cwd, timeout=900):
+    """Like run(), but drops stdout and keeps only the first STDERR_CAP bytes of stderr.
+
+    Lint/typecheck/test output can run to megabytes; nothing reads stdout and the
+    report truncates stderr, so don't buffer or decode more than that.
+    """
+    # Own session, so a timeout can kill the whole tree: pnpm/npx hand the work to
+    # node/eslint/tsc grandchildren, which would otherwise hold stderr open
+    p = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, start_new_session=True)
+    head = bytearray()
+
+    def drain():
+        # Keep reading past the cap (and discard) so the child never blocks on a full pipe
+        try:
+            for chunk in iter(lambda: p.stderr.read(4096), b""):
+                if len(head) < STDERR_CAP:
+                    head.extend(chunk[: STDERR_CAP - len(head)])
+        except (OSError, ValueError):
+            pass  # pipe closed under us after an abandoned join
+
+    drainer = threading.Thread(target=drain, daemon=True)
+    drainer.start()
+    try:
+        p.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if hasattr(os, "killpg"):
+            os.killpg(p.pid, signal.SIGKILL)
+        else:
+            p.kill()
+        p.wait()
+        raise
+    finally:
+        # Bounded: if anything still holds the pipe, the daemon thread is left behind
+        # rather than stalling the hook past its timeout
+        drainer.join(timeout=5)
+        p.stderr.close()
+    return subprocess.CompletedProcess(cmd, p.returncode, None, head.decode("utf-8", errors="replace"))
+
+def parse_porcelain_v2(out: str) -> dict:
+    """Split `git status --porcelain=v2 -z` output into staged/unstaged/untracked paths."""
+    status = {"staged": [], "unstaged": [], "untracked": []}
+    records = iter(out.split("\0"))
+    for rec in records:
+        kind = rec[:1]
+        if kind == "?":
+            status["untracked"].append(rec[2:])
+            continue
+        if kind not in ("1", "2", "u"):
+            continue  # ignored entries / trailing empty record
+        # Ordinary (1), rename/copy (2) and unmerged (u) entries differ only in field count
+        fields = rec.split(" ", {"1": 8, "2": 9, "u": 10}[kind])
+        xy, path = fields[1], fields[-1]
+        if kind == "2":
+            next(records, None)  # the rename's original path
+        if xy[0] != ".":
+            status["staged"].append(path)
+        if xy[1] != ".":
+            status["unstaged"].append(path)
+    return status
+
+def changed_files(project_dir: Path) -> list[str]:
+    """Staged, unstaged and untracked paths, from one status query."""
+    if pygit2 is not None:
+        try:
+            # status() covers index, worktree and untracked files. Before pygit2 1.14 it
+            # uses libgit2's defaults, which report ignored files too: drop those here
+            status = pygit2.Repository(str(project_dir)).status()
+            return [path for path, flags in status.items() if not flags & pygit2.GIT_STATUS_IGNORED]
+        except Exception:
+            pass  # unreadable repo / libgit2 mismatch: the git CLI still works
+    r = run(["git", "status", "--porcelain=v2", "-z", "--untracked-files=all"], cwd=str(project_dir), timeout=30)
+    status = parse_porcelain_v2(r.stdout.decode("utf-8", errors="surrogateescape"))
+    # dict.fromkeys: a file staged and then edited again appears in both lists
+    return list(dict.fromkeys(status["staged"] + status["unstaged"] + status["untracked"]))
+
+# Lockfile -> package manager, checked in this order
+LOCKFILE_PMS = (
+    ("pnpm-lock.yaml", "pnpm"),
+    ("yarn.lock", "yarn"),
+    ("bun.lockb", "bun"),
+)
+
+def detect_pm(project_dir: Path, top_level: Optional[set[str]] = None) -> list[str]:
+    # Reuse main()'s directory listing when we have it instead of stat'ing each lockfile
+    if top_level is None:
+        top_level = {name for name, _ in LOCKFILE_PMS if (project_dir / name).exists()}
+    for lockfile, pm in LOCKFILE_PMS:
+        if lockfile in top_level:
+            return [pm]
     return ["npm"]
 
-def has_script(project_dir: Path, script: str) -> bool:
-    pkg = project_dir / "package.json"
-    if not pkg.exists():
-        return False
+@functools.lru_cache(maxsize=8)
+def load_scripts(project_dir: Path, mtime_ns: int) -> frozenset:
+    # Keyed on package.json's mtime, so an edit invalidates both the in-process and on-disk copy
+    cached = read_cache(project_dir, "pkg_scripts.json")
+    if cached.get("mtime_ns") == mtime_ns:
+        return frozenset(cached.get("scripts") or ())
     try:
-        import json as _json
-        data = _json.loads(pkg.read_text(encoding="utf-8"))
-        scripts = (data.get("scripts") or {})
-        return script in scripts
+        data = json.loads((project_dir / "package.json").read_text(encoding="utf-8"))
+        scripts = frozenset(data.get("scripts") or {})
     except Exception:
+        return frozenset()
+    write_cache(project_dir, "pkg_scripts.json", {"mtime_ns": mtime_ns, "scripts": sorted(scripts)})
+    return scripts
+
+def has_script(project_dir: Path, script: str) -> bool:
+    try:
+        mtime_ns = (project_dir / "package.json").stat().st_mtime_ns
+    except OSError:
         return False
+    return script in load_scripts(project_dir, mtime_ns)
 
 def main() -> int:
     project_dir = Path(os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
 
+    # One directory listing answers both "JS/TS project?" and "git repo?"
+    try:
+        with os.scandir(project_dir) as it:
+            top_level = {entry.name for entry in it}
+    except OSError:
+        return 0
+
     # If not a JS/TS project, do nothing
-    if not (project_dir / "package.json").exists():
+    if "package.json" not in top_level:
         return 0
 
     # Determine changed files (if not a git repo, skip)
-    git_dir = project_dir / ".git"
-    if not git_dir.exists():
+    if ".git" not in top_level:
         return 0
 
-    diff = run(["git", "diff", "--name-only"], cwd=str(project_dir), timeout=30)
-    changed = [line.strip().replace("\\", "/") for line in diff.stdout.splitlines() if line.strip()]
+    # git status is the slow part of startup; read package.json's scripts while it runs
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        changed_future = pool.submit(changed_files, project_dir)
+        scripts = {name: has_script(project_dir, name) for name in ("lint", "typecheck", "test")}
+        changed = changed_future.result()
 
     if not changed:
         return 0
 
-    pm = detect_pm(project_dir)
+    pm = detect_pm(project_dir, top_level)
     pm_cmd = pm[0]
 
     errors = []
+    checks = []  # (failure label, command)
+
+    code_touched = any(p.endswith(CODE_EXTS) for p in changed)
+    should_lint = code_touched or any(p in LINT_CONFIGS for p in changed)
+    should_typecheck = code_touched or any(p in TYPECHECK_CONFIGS for p in changed)
 
     # Lint (if script exists)
-    if has_script(project_dir, "lint"):
-        r = run([pm_cmd, "run", "lint"], cwd=str(project_dir), timeout=900)
-        if r.returncode != 0:
-            errors.append("lint failed")
-            if r.stderr.strip():
-                errors.append(r.stderr.strip()[:2000])
+    if not should_lint:
+        pass
+    elif scripts["lint"]:
+        checks.append(("lint failed", [pm_cmd, "run", "lint"]))
     else:
         # Optional: eslint if present
         eslint_bin = project_dir / "node_modules/.bin/eslint"
         if eslint_bin.exists():
-            r = run(["npx", "eslint", "."], cwd=str(project_dir), timeout=900)
-            if r.returncode != 0:
-                errors.append("eslint failed")
-                if r.stderr.strip():
-                    errors.append(r.stderr.strip()[:2000])
+            checks.append(("eslint failed", ["npx", "eslint", "."]))
 
     # Typecheck (prefer script; fallback to tsc)
-    if has_script(project_dir, "typecheck"):
-        r = run([pm_cmd, "run", "typecheck"], cwd=str(project_dir), timeout=900)
+    if not should_typecheck:
+        pass
+    elif scripts["typecheck"]:
+        checks.append(("typecheck failed", [pm_cmd, "run", "typecheck"]))
     else:
-        r = run(["npx", "tsc", "--noEmit"], cwd=str(project_dir), timeout=900)
-    if r.returncode != 0:
-        errors.append("typecheck failed")
-        if r.stderr.strip():
-            errors.append(r.stderr.strip()[:2000])
+        checks.append(("typecheck failed", ["npx", "tsc", "--noEmit"]))
 
     # Run tests only if changes touch core code paths (keeps Stop fast for docs/config edits)
     should_test = any(p.startswith(TEST_RELEVANT_PREFIXES) for p in changed)
-    if should_test and has_script(project_dir, "test"):
-        r = run([pm_cmd, "test"], cwd=str(project_dir), timeout=900)
+    if should_test and scripts["test"]:
+        checks.append(("tests failed", [pm_cmd, "test"]))
+
+    if not checks:
+        return 0
+
+    # Checks are independent: run them side by side so Stop costs the slowest one, not the sum.
+    # pool.map yields in submission order, so the error report stays deterministic.
+    with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+        results = list(pool.map(lambda c: run_check(c[1], cwd=str(project_dir), timeout=900), checks))
+
+    for (label, _), r in zip(checks, results):
         if r.returncode != 0:
-            errors.append("tests failed")
+            errors.append(label)
             if r.stderr.strip():
                 errors.append(r.stderr.strip()[:2000])
 
@@ -0,0 +1,126 @@
+"""Pass/issue bookkeeping, issue screenshots, console-error capture and the summary block shared by the flow scripts."""
+import json, os, re, sys
+
+SCREENSHOTS_DIR = "/tmp/roomshare-tests"
+
+# run_flows.py points each script at its own results file through this variable
+RESULT_ENV = "ROOMSHARE_FLOW_RESULT"
+
+# Console errors that aren't Roomshare bugs: the Photon geocoder timing out from headless
+# runs, and requests the flows themselves block (_flow_helpers.block_urls)
+SKIP_CONSOLE = re.compile(r"photon\.komoot|ERR_BLOCKED_BY_CLIENT", re.IGNORECASE)
+# Distinct console errors kept per run; check_console() reports only the first ten anyway
+MAX_CONSOLE_ERRORS = 100
+
+class Flow:
+    """Results of one flow run.
+
+    With buffered=True, log() collects lines instead of printing them, so a test running
+    on a worker thread can have its output replayed in order later.
+    """
+
+    def __init__(self, buffered=False):
+        self.passes = []
+        self.issues = []
+        self.console_errors = []
+        self._console_seen = set()
+        self.lines = [] if buffered else None
+        self._issue_page = None
+        self._issue_prefix = None
+
+    def log(self, msg):
+        if self.lines is None:
+            print(msg)
+        else:
+            self.lines.append(msg)
+
+    def log_pass(self, msg):
+        self.passes.append(msg)
+        self.log(f"  PASS: {msg}")
+
+    def log_issue(self, msg):
+        self.issues.append(msg)
+        self.log(f"  ISSUE: {msg}")
+        if self._issue_page is not None:
+            path = f"{SCREENSHOTS_DIR}/{self._issue_prefix}_issue_{len(self.issues):02}.jpg"
+            try:
+                self._issue_page.screenshot(path=path, type="jpeg", quality=60)
+            except Exception:
+                pass  # a page that's already gone has nothing left to show
+
+    def snap_issues(self, page, prefix):
+        """From now on, screenshot page as each issue is logged.
+
+        The shot shows the state the check failed in, which is the only time one is
+        worth its ~100-400ms; passing checks take none.
+        """
+        os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+        self._issue_page = page
+        self._issue_prefix = prefix
+
+    def watch_console(self, page):
+        """Record console.error() output and uncaught exceptions from page.
+
+        Playwright reports uncaught exceptions as "pageerror", never as console
+        messages, so the console listener alone let a throwing handler pass silently.
+
+        These stay protocol listeners rather than an init script wrapping
+        console.error into a window buffer read back at the end: that buffer starts
+        over on every navigation, and it never sees the browser's own errors
+        (failed resource loads, ERR_BLOCKED_BY_CLIENT). The events arrive with the
+        message text, so each one costs no extra round-trip.
+        """
+        page.on("console", lambda msg: self._record_console_error(msg.text) if msg.type == "error" else None)
+        page.on("pageerror", lambda exc: self._record_console_error(f"Uncaught {exc.name}: {exc.message}"))
+
+    def _record_console_error(self, text):
+        """Keep the first MAX_CONSOLE_ERRORS distinct errors.
+
+        A page that logs the same error from a render loop or retry timer would
+        otherwise grow the list without bound and repeat it in the report.
+        """
+        if text not in self._console_seen and len(self.console_errors) < MAX_CONSOLE_ERRORS:
+            self._console_seen.add(text)
+            self.console_errors.append(text)
+
+    def merge(self, other):
+        """Fold a buffered sub-run's results into this one (its lines are not replayed)."""
+        self.passes.extend(other.passes)
+        self.issues.extend(other.issues)
+        for err in other.console_errors:
+            self._record_console_error(err)
+
+    def check_console(self):
+        self.log("\n=== Console Errors ===")
+        real_errors = [e for e in self.console_errors if not SKIP_CONSOLE.search(e)]
+        if real_errors:
+            for err in real_errors[:10]:
+                self.log_issue(f"Console error: {err[:200]}")
+        else:
+            self.log_pass("No unexpected console errors")
+
+    def finish(self, label, title):
+        """Print the summary and verdict; return the process exit code.
+
+        The full results also go to SCREENSHOTS_DIR/summary-<label>.json, and to
+        the file RESULT_ENV names when a runner set it. Every pass was already
+        logged as it happened, so off a terminal (CI logs, run_flows -j children)
+        they are only counted here; issues are always listed. The block goes out
+        in one write, so it can't interleave with other output mid-summary.
+        """
+        slug = re.sub(r"\W+", "-", label.lower()).strip("-")
+        os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+        results = {"flow": label, "title": title, "passes": self.passes, "issues": self.issues}
+        for path in filter(None, [f"{SCREENSHOTS_DIR}/summary-{slug}.json", os.environ.get(RESULT_ENV)]):
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+
+        out = ["\n" + "=" * 50, f"{label} SUMMARY: {title}", "=" * 50, f"PASSES: {len(self.passes)}"]
+        if sys.stdout.isatty():
+            out.extend(f"  ✅ {p_msg}" for p_msg in self.passes)
+        out.append(f"ISSUES: {len(self.issues)}")
+        out.extend(f"  ❌ {i_msg}" for i_msg in self.issues)
+        out.append(f"\n{label}: {'ISSUES FOUND' if self.issues else 'ALL PASSED'}")
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
+        return 1 if self.issues else 0
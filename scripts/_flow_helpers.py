@@ -0,0 +1,232 @@
+"""Condition-based waits for the flow scripts, in place of fixed wait_for_timeout() sleeps."""
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+import os, re, threading, time, urllib.request
+
+SCREENSHOTS_DIR = "/tmp/roomshare-tests"
+# Screenshots are a debugging aid: only taken with SCREENSHOTS=1
+SNAP = os.environ.get("SCREENSHOTS") == "1"
+
+FILTER_MODAL_APPLY = "[data-testid='filter-modal-apply']"
+
+# Every Filters trigger (desktop quick-filter bar, mobile strip, collapsed mobile search)
+# carries one of these test ids. Plain CSS: the role-and-name query it replaces made
+# the engine compute accessible names for every button on the page
+FILTERS_BUTTON = "[data-testid='quick-filter-more-filters']:visible, [data-testid='mobile-filter-button']:visible"
+# The filter modal's title, for checking it opened
+FILTER_MODAL_TITLE = "#filter-drawer-title"
+APPLY_NAME = re.compile(r"Show|Apply")
+
+def warm_up(url):
+    """GET url on a background thread, e.g. while Chromium launches.
+
+    `next dev` compiles a route on its first request; starting that now means the
+    first page.goto() finds it compiled instead of waiting on the compile.
+    """
+    def fetch():
+        try:
+            with urllib.request.urlopen(url, timeout=60) as resp:
+                resp.read()
+        except Exception:
+            pass  # the real navigation will report a server that's down
+
+    threading.Thread(target=fetch, daemon=True).start()
+
+# Third parties the flows never assert on. The app geocodes through its own API and
+# self-hosts its fonts via next/font, so these only turn up as stray requests that
+# hold wait_ready() open and fail into the console
+THIRD_PARTY = ["*photon.komoot*", "*google-analytics*", "*googletagmanager*", "*fonts.gstatic*"]
+# The app's own telemetry beacons (search metrics, web vitals): fire-and-forget POSTs
+# that land mid-flow and hold wait_ready() open just like the third parties above
+TELEMETRY = ["*/api/metrics*", "*/api/web-vitals*"]
+# Listing photos (next/image and the Unsplash seed images), web fonts and video:
+# most of a /search page's bytes, and nothing the click-through checks look at
+HEAVY_ASSETS = ["*/_next/image*", "*images.unsplash.com*", "*.woff2", "*.woff", "*.mp4", "*.webm"]
+# The map's style, vector tiles and glyphs (OpenFreeMap, or Stadia when configured):
+# a steady stream of requests for as long as the map is on screen. The map swallows
+# the resulting fetch errors (Map.tsx onError), so only flows that never look at it
+# should block them
+MAP_TILES = ["*tiles.openfreemap.org*", "*tiles.stadiamaps.com*", "*api.stadiamaps.com*"]
+
+def block_urls(page, patterns):
+    """Fail page's requests to URLs matching any of the wildcard patterns.
+
+    Goes through CDP's Network.setBlockedURLs instead of page.route(): routing turns
+    on request interception, which disables the HTTP cache (undoing flow_context's
+    warm cache) and sends every request through a Python callback.
+    """
+    cdp = page.context.new_cdp_session(page)
+    cdp.send("Network.enable")
+    cdp.send("Network.setBlockedURLs", {"urls": patterns})
+
+def block_third_party(page):
+    block_urls(page, THIRD_PARTY + TELEMETRY)
+
+def block_heavy_assets(page):
+    """block_third_party() plus HEAVY_ASSETS and MAP_TILES, for flows that only check navigation."""
+    block_urls(page, THIRD_PARTY + TELEMETRY + HEAVY_ASSETS + MAP_TILES)
+
+# Next's build output. Content-hashed under `next start`; under `next dev` it keeps its
+# URLs for the whole server session but is sent no-store, so every navigation
+# downloads the same chunks again
+STATIC_ASSETS = re.compile(r"/_next/static/")
+# The body is already decoded, and its length is recomputed on fulfill
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+_static_cache = {}
+
+def cache_static_assets(page):
+    """Serve STATIC_ASSETS from a process-wide memory cache after their first fetch.
+
+    Deliberately lives only as long as the process: a dev server rebuilds chunks
+    under the same URLs when the code changes. Pages and documents still come from
+    the server every time, since that is what the flows are checking.
+
+    For run_parallel() page_setup only. Never combine it with flow_context(): the
+    page.route() it installs turns off Chromium's HTTP cache for every request on
+    the page, throwing away the disk cache flow_context keeps across runs.
+    """
+    def handle(route):
+        request = route.request
+        if request.method != "GET":
+            route.continue_()
+            return
+        cached = _static_cache.get(request.url)
+        if cached is None:
+            response = route.fetch()
+            if response.status != 200:
+                route.fulfill(response=response)
+                return
+            headers = {k: v for k, v in response.headers.items() if k.lower() not in _HOP_HEADERS}
+            cached = _static_cache[request.url] = (headers, response.body())
+        headers, body = cached
+        route.fulfill(status=200, headers=headers, body=body)
+
+    page.route(STATIC_ASSETS, handle)
+
+# localhost answers actions in well under a second, so a stuck locator should fail
+# fast; navigations keep more room because `next dev` compiles a route on first hit
+ACTION_TIMEOUT_MS = 3000
+NAVIGATION_TIMEOUT_MS = 15000
+
+def local_timeouts(page):
+    """Default page to ACTION_TIMEOUT_MS / NAVIGATION_TIMEOUT_MS instead of Playwright's 30s."""
+    page.set_default_timeout(ACTION_TIMEOUT_MS)
+    page.set_default_navigation_timeout(NAVIGATION_TIMEOUT_MS)
+
+def filters_button(page):
+    return page.locator(FILTERS_BUTTON).first
+
+def apply_button(page):
+    """The filter modal's apply button, by test id with a Show/Apply label as fallback."""
+    return page.get_by_test_id("filter-modal-apply").or_(page.get_by_role("button", name=APPLY_NAME)).first
+
+# Long-lived by design; waiting for them to finish would always run to the timeout
+_STREAMING_TYPES = ("eventsource", "websocket")
+
+def wait_ready(page, idle_ms=500, timeout_ms=10000):
+    """Wait for DOMContentLoaded, then until no request has been in flight for idle_ms.
+
+    Bounded by timeout_ms and never raises on it: map tiles and analytics beacons can
+    keep the network busy indefinitely, which is what makes networkidle stall.
+    Returns True if the page went quiet, False if the bound was hit.
+    """
+    inflight = set()
+    last_activity = time.monotonic()
+
+    def started(request):
+        nonlocal last_activity
+        if request.resource_type not in _STREAMING_TYPES:
+            inflight.add(request)
+            last_activity = time.monotonic()
+
+    def finished(request):
+        nonlocal last_activity
+        inflight.discard(request)
+        last_activity = time.monotonic()
+
+    page.on("request", started)
+    page.on("requestfinished", finished)
+    page.on("requestfailed", finished)
+    try:
+        page.wait_for_load_state("domcontentloaded", timeout=timeout_ms)
+        deadline = time.monotonic() + timeout_ms / 1000
+        while time.monotonic() < deadline:
+            if not inflight and time.monotonic() - last_activity >= idle_ms / 1000:
+                return True
+            # Short poll; also pumps Playwright's event loop so the handlers above run
+            page.wait_for_timeout(50)
+        return False
+    finally:
+        page.remove_listener("request", started)
+        page.remove_listener("requestfinished", finished)
+        page.remove_listener("requestfailed", finished)
+
+def wait_for_url_param(page, name, present=True, timeout_ms=5000, value=None):
+    """Wait until the query string does (or, with present=False, doesn't) contain name.
+
+    With value, name must also have that value: needed when the page already carries
+    the parameter and the action only changes it. Returns False on timeout so the
+    caller's own URL check reports the failure.
+    """
+    try:
+        page.wait_for_function(
+            """([name, present, value]) => {
+                const params = new URLSearchParams(location.search);
+                return params.has(name) === present && (value === null || params.get(name) === value);
+            }""",
+            arg=[name, present, value],
+            timeout=timeout_ms,
+        )
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+def wait_visible(locator, timeout_ms=5000):
+    """locator.wait_for(state="visible") that returns False instead of raising on timeout."""
+    try:
+        locator.wait_for(state="visible", timeout=timeout_ms)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+def wait_for_url_contains(page, fragment, timeout_ms=5000):
+    """Wait for a navigation to a URL containing fragment; False on timeout."""
+    try:
+        page.wait_for_url(lambda url: fragment in url, wait_until="domcontentloaded", timeout=timeout_ms)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+SEARCH_RESULTS = "[data-testid='listing-card'], [data-testid='empty-state']"
+LISTING_LINK = "a[href*='/listings/']"
+# A result card's title, which sits inside its listing link
+LISTING_TITLE = f"[data-testid='listing-card'] {LISTING_LINK} h3"
+
+def wait_for_search_results(page, timeout_ms=10000):
+    """Wait until /search shows either a listing card or its empty state; False on timeout."""
+    return wait_visible(page.locator(SEARCH_RESULTS).first, timeout_ms)
+
+def safe_goto(page, url, timeout=NAVIGATION_TIMEOUT_MS):
+    """Navigate to a /search URL and wait for its results, then for the page to settle.
+
+    networkidle used to time out here (map tiles never stop) and trigger a second
+    navigation; waiting on the results and a bounded quiet period doesn't. goto()
+    returns at commit: the results are server-rendered, so the card wait is what
+    actually says the page is there, and the quiet period covers hydration.
+
+    The checks that only look at the resulting URL still come through here rather
+    than a page.request GET: SearchUrlCanonicalizer rewrites the query string in
+    the browser once the page hydrates, which a bare HTTP response never shows.
+    """
+    page.goto(url, wait_until="commit", timeout=timeout)
+    wait_for_search_results(page)
+    wait_ready(page)
+
+def snap(page, name, full_page=False, always=False):
+    """Screenshot to SCREENSHOTS_DIR/<name>.jpg when SCREENSHOTS=1 (or always), else a no-op.
+
+    JPEG rather than PNG: it encodes several times faster, which adds up on the
+    full-page shots the recon scripts take.
+    """
+    if SNAP or always:
+        os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+        page.screenshot(path=f"{SCREENSHOTS_DIR}/{name}.jpg", full_page=full_page, type="jpeg", quality=60)
@@ -0,0 +1,237 @@
+"""Shared headless Chromium for the scripts/test_*.py flows.
+
+Start it once before running several flow scripts back to back:
+
+    python scripts/_playwright_server.py      # runs until Ctrl-C / SIGTERM
+
+Scripts attach to this browser over CDP when the endpoint file points at a live
+one and launch their own otherwise, so they still work standalone. Scripts that
+drive a single context open it with flow_context(p, ...), which on a private
+launch keeps Chromium's HTTP cache in HTTP_CACHE_DIR so repeat runs skip
+re-downloading static assets. Only the cache persists, never the profile.
+
+run_flows.py goes one step further and runs every script in a single process:
+it sets _session/_endpoint so the scripts reuse its Playwright driver too.
+
+Scripts made of independent tests hand them to run_parallel(), which runs them
+several at a time, each in its own context on one Chromium.
+"""
+from playwright.sync_api import sync_playwright
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+import os, queue, signal, socket, sys, tempfile, time, urllib.request
+
+from _flow_common import Flow
+
+SCREENSHOTS_DIR = "/tmp/roomshare-tests"
+ENDPOINT_FILE = Path(SCREENSHOTS_DIR) / "browser.ws"
+# run_flows.py -j hands its browser to child processes through this variable
+ENDPOINT_ENV = "ROOMSHARE_BROWSER_ENDPOINT"
+# ...and each child's share of run_parallel() workers through this one
+WORKERS_ENV = "ROOMSHARE_FLOW_WORKERS"
+# Reused by every private launch. Only the cache is kept: each run still gets a
+# throwaway profile, because the app keeps UI state (list/map view, map preference,
+# recent searches) in localStorage and a carried-over profile would leak it.
+# ROOMSHARE_HTTP_CACHE moves it, e.g. onto a directory CI restores between jobs
+HTTP_CACHE_DIR = Path(os.environ.get("ROOMSHARE_HTTP_CACHE") or Path(SCREENSHOTS_DIR) / "http-cache")
+
+# Set by run_flows.py while it drives the scripts in-process
+_session = None
+_endpoint = None
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def shared_endpoint():
+    """Endpoint of the running shared browser, or None if no server was started."""
+    if _endpoint:
+        return _endpoint
+    if os.environ.get(ENDPOINT_ENV):
+        return os.environ[ENDPOINT_ENV]
+    try:
+        return ENDPOINT_FILE.read_text().strip() or None
+    except OSError:
+        return None
+
+def _endpoint_alive(endpoint):
+    """Whether a browser still answers at endpoint; the endpoint file can outlive its server."""
+    try:
+        with urllib.request.urlopen(f"{endpoint}/json/version", timeout=2):
+            return True
+    except OSError:
+        return False
+
+@contextmanager
+def playwright_session():
+    """sync_playwright(), or run_flows.py's already-started driver when it is running us."""
+    if _session is not None:
+        yield _session
+    else:
+        with sync_playwright() as p:
+            yield p
+
+@contextmanager
+def flow_context(p, **kwargs):
+    """A fresh BrowserContext (kwargs as for new_context), closed on exit.
+
+    Contexts default to reduced_motion="reduce": the app's prefers-reduced-motion
+    rules then cut CSS animations and transitions to ~0ms, so clicks and waits
+    never sit through card entrances or sheet slides.
+
+    On the shared browser this is an ordinary new_context(). Otherwise Chromium is
+    launched around a temporary profile with its disk cache in HTTP_CACHE_DIR;
+    new_context() contexts are off-the-record and only ever cache in memory.
+    """
+    kwargs.setdefault("reduced_motion", "reduce")
+    endpoint = shared_endpoint()
+    if endpoint:
+        try:
+            browser = p.chromium.connect_over_cdp(endpoint, timeout=5000)
+        except Exception:
+            browser = None  # stale endpoint file from a server that has since exited
+        if browser is not None:
+            try:
+                yield browser.new_context(**kwargs)
+            finally:
+                browser.close()
+            return
+
+    with tempfile.TemporaryDirectory(prefix="roomshare-profile-") as profile:
+        context = p.chromium.launch_persistent_context(
+            profile, headless=True, args=[f"--disk-cache-dir={HTTP_CACHE_DIR}"], **kwargs
+        )
+        try:
+            yield context
+        finally:
+            context.close()
+
+@contextmanager
+def _connected(endpoint):
+    """This thread's own Playwright driver, attached to the browser at endpoint."""
+    with sync_playwright() as p:
+        browser = p.chromium.connect_over_cdp(endpoint)
+        try:
+            yield browser
+        finally:
+            browser.close()
+
+def _run_isolated(browser, test, page_setup, context_kwargs):
+    """Run one test in its own context on browser; return its buffered results."""
+    flow = Flow(buffered=True)
+    context = browser.new_context(**context_kwargs)
+    try:
+        page = context.new_page()
+        if page_setup is not None:
+            page_setup(page)
+        flow.watch_console(page)
+        test(page, flow)
+    except Exception as e:
+        flow.log_issue(f"{test.__name__} crashed: {e}")
+    finally:
+        context.close()
+    return flow
+
+def parallel_workers():
+    """Tests run_parallel() may run at once: WORKERS_ENV if set, else all but two cores.
+
+    The two spare cores are for Chromium's own processes and the dev server.
+    """
+    if os.environ.get(WORKERS_ENV):
+        return max(1, int(os.environ[WORKERS_ENV]))
+    return max(1, (os.cpu_count() or 4) - 2)
+
+def _run_all(endpoint, tests, page_setup, context_kwargs, prime_url):
+    def prime():
+        with _connected(endpoint) as browser:
+            _run_isolated(browser, lambda page, _: page.goto(prime_url, wait_until="load"), page_setup, context_kwargs)
+
+    # Each worker starts one driver and connection and takes tests off the queue until
+    # it is empty, rather than paying that start-up again for every test
+    results = [None] * len(tests)
+    pending = queue.SimpleQueue()
+    for item in enumerate(tests):
+        pending.put(item)
+
+    def worker():
+        with _connected(endpoint) as browser:
+            while True:
+                try:
+                    i, test = pending.get_nowait()
+                except queue.Empty:
+                    return
+                results[i] = _run_isolated(browser, test, page_setup, context_kwargs)
+
+    workers = min(parallel_workers(), len(tests))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if prime_url:
+            # Alone, so the page_setup caches fill once rather than once per worker racing
+            # the others; its output and console are of no interest. On a pool thread
+            # because the caller's thread may already be running a sync Playwright
+            # (run_flows.py in-process, or the private launch below), which can't nest
+            pool.submit(prime).result()
+        for future in [pool.submit(worker) for _ in range(workers)]:
+            future.result()
+    return results
+
+def run_parallel(tests, page_setup=None, prime_url=None, **context_kwargs):
+    """Run independent test(page, flow) functions concurrently; return their merged Flow.
+
+    Every test gets a fresh context (kwargs as for new_context, reduced motion by
+    default) on one Chromium: the shared browser when it is up, otherwise a private
+    one launched with a CDP port. Worker threads each drive it from their own
+    Playwright instance, since the sync API is per-thread. page_setup(page), e.g.
+    block_third_party, runs on each new page. Output is printed in test order, so
+    the log reads the same as a serial run.
+
+    With prime_url, one page loads it before any test starts. Caches that
+    page_setup installs (cache_static_assets) are then warm for every test instead
+    of each worker fetching the same chunks at once. Contexts still start with
+    empty storage: the app keeps UI state in localStorage, and carrying one over
+    would couple the tests.
+    """
+    context_kwargs.setdefault("reduced_motion", "reduce")
+    # Only a shared browser that is gone falls back to a private one: any other failure
+    # is a real error and is raised, not hidden behind a silent second run
+    endpoint = shared_endpoint()
+    if endpoint and _endpoint_alive(endpoint):
+        results = _run_all(endpoint, tests, page_setup, context_kwargs, prime_url)
+    else:
+        port = free_port()
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True, args=[f"--remote-debugging-port={port}"])
+            try:
+                results = _run_all(f"http://127.0.0.1:{port}", tests, page_setup, context_kwargs, prime_url)
+            finally:
+                browser.close()
+
+    flow = Flow()
+    for test_flow in results:
+        print("\n".join(test_flow.lines))
+        flow.merge(test_flow)
+    return flow
+
+def main():
+    os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+    # Turn SIGTERM into a normal exit so the finally block cleans up
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    port = free_port()
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=[f"--remote-debugging-port={port}"])
+        endpoint = f"http://127.0.0.1:{port}"
+        ENDPOINT_FILE.write_text(endpoint)
+        print(f"Shared browser listening on {endpoint} (endpoint in {ENDPOINT_FILE})")
+        try:
+            while browser.is_connected():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            ENDPOINT_FILE.unlink(missing_ok=True)
+            browser.close()
+
+if __name__ == "__main__":
+    main()
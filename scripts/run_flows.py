@@ -0,0 +1,139 @@
+"""Run the scripts/test_*.py flows against one browser, in one process or N at a time.
+
+    python scripts/run_flows.py                        # every test_*.py flow, one after another
+    python scripts/run_flows.py test_flow2_dates.py    # just the named ones
+    python scripts/run_flows.py 'test_flow8_*'         # or the ones a pattern matches
+    python scripts/run_flows.py -j 4                   # four flows at once
+    python scripts/run_flows.py -j auto                # as many at once as the cores allow
+
+Each script still runs as __main__ with its own output and exit code; the runner
+only saves the per-script driver spawn and Chromium cold start. With -j, flows run
+as child processes that each open a context on the runner's browser, and their
+output is printed in script order once they finish. Scripts that fan their own
+tests out through run_parallel() then split the cores between them instead of
+each claiming all of them.
+
+The closing summary counts each script's passes and issues from the results file
+its Flow.finish() writes, so nothing has to be parsed back out of the output.
+"""
+from playwright.sync_api import sync_playwright
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse, json, os, runpy, subprocess, sys, time, traceback
+
+import _playwright_server
+from _flow_common import RESULT_ENV, SCREENSHOTS_DIR
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = Path(SCREENSHOTS_DIR) / "results"
+
+def result_file(path):
+    """Where the script at path reports its results; cleared so a stale file can't stand in."""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    result = RESULTS_DIR / f"{path.stem}.json"
+    result.unlink(missing_ok=True)
+    return result
+
+def result_counts(result):
+    """(passes, issues) from a results file, or None if the script didn't write one."""
+    try:
+        data = json.loads(result.read_text())
+    except (OSError, ValueError):
+        return None
+    return len(data["passes"]), len(data["issues"])
+
+def run_script(path):
+    """Run one flow script as __main__ and return its exit code."""
+    try:
+        runpy.run_path(str(path), run_name="__main__")
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
+
+def run_script_process(path, endpoint, workers):
+    """Run one flow script in a child process attached to endpoint; return (code, output, seconds).
+
+    workers caps the script's run_parallel() pool, so N children don't each size
+    theirs to the whole machine.
+    """
+    env = dict(os.environ, **{
+        _playwright_server.ENDPOINT_ENV: endpoint,
+        _playwright_server.WORKERS_ENV: str(workers),
+        RESULT_ENV: str(result_file(path)),
+    })
+    start = time.monotonic()
+    r = subprocess.run([sys.executable, str(path)], env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return r.returncode, r.stdout, time.monotonic() - start
+
+def jobs_arg(value):
+    """-j value: a positive count, or "auto" (resolved once the scripts are known)."""
+    if value == "auto":
+        return value
+    jobs = int(value)
+    if jobs < 1:
+        raise argparse.ArgumentTypeError("must be at least 1 or 'auto'")
+    return jobs
+
+def auto_jobs(n_scripts):
+    return min(_playwright_server.parallel_workers(), n_scripts)
+
+def banner(name):
+    print(f"\n{'#' * 50}\n# {name}\n{'#' * 50}", flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scripts", nargs="*", help="flow scripts or glob patterns to run (default: every test_*.py)")
+    parser.add_argument("-j", "--jobs", type=jobs_arg, default=1, help="flows to run at once, or 'auto' (default: 1)")
+    args = parser.parse_args()
+
+    scripts = []
+    for pattern in args.scripts or ["test_*.py"]:
+        # Only the file name counts, so shell-expanded scripts/... paths work too
+        matches = sorted(SCRIPTS_DIR.glob(Path(pattern).name))
+        if not matches:
+            parser.error(f"no flow script matches {pattern!r}")
+        scripts.extend(m for m in matches if m not in scripts)
+    jobs = auto_jobs(len(scripts)) if args.jobs == "auto" else args.jobs
+
+    results = []
+    with sync_playwright() as p:
+        port = _playwright_server.free_port()
+        browser = p.chromium.launch(headless=True, args=[f"--remote-debugging-port={port}"])
+        endpoint = f"http://127.0.0.1:{port}"
+        try:
+            if jobs > 1:
+                # The sync API is tied to the thread that started it, so concurrent flows
+                # get a process (and driver) each; they still share this one Chromium
+                workers = max(1, _playwright_server.parallel_workers() // jobs)
+                with ThreadPoolExecutor(max_workers=jobs) as pool:
+                    outcomes = list(pool.map(lambda s: run_script_process(s, endpoint, workers), scripts))
+                for script, (code, output, elapsed) in zip(scripts, outcomes):
+                    banner(script.name)
+                    print(output, end="")
+                    results.append((script.name, code, elapsed))
+            else:
+                _playwright_server._session = p
+                _playwright_server._endpoint = endpoint
+                for script in scripts:
+                    banner(script.name)
+                    os.environ[RESULT_ENV] = str(result_file(script))
+                    start = time.monotonic()
+                    code = run_script(script)
+                    results.append((script.name, code, time.monotonic() - start))
+        finally:
+            _playwright_server._session = _playwright_server._endpoint = None
+            os.environ.pop(RESULT_ENV, None)
+            browser.close()
+
+    print("\n" + "=" * 50)
+    print("FLOW RUNNER SUMMARY")
+    print("=" * 50)
+    for name, code, elapsed in results:
+        counts = result_counts(RESULTS_DIR / f"{Path(name).stem}.json")
+        detail = f"{counts[0]} passed, {counts[1]} issues, " if counts else ""
+        print(f"  {'✅' if code == 0 else '❌'} {name} ({detail}{elapsed:.1f}s)")
+
+    sys.exit(1 if any(code != 0 for _, code, _ in results) else 0)
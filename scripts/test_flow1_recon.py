@@ -1,110 +1,114 @@
 """Flow 1 Recon: Take screenshots and discover selectors on the search page."""
-from playwright.sync_api import sync_playwright
-import json, os
-
-SCREENSHOTS_DIR = "/tmp/roomshare-tests"
-os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
-
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page(viewport={"width": 1280, "height": 900})
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from _playwright_server import flow_context, playwright_session
+from _flow_helpers import snap, wait_for_search_results, wait_ready, warm_up
+from collections import Counter
+import json
+
+# Evaluated in the page over all matches at once. Visibility is approximated with the
+# usual offset/client-rect check, which is close enough to is_visible() for recon.
+DESCRIBE_JS = """(els, limit) => els.slice(0, limit).map(e => ({
+    tag: e.tagName,
+    text: (e.textContent || '').trim().slice(0, 100),
+    testid: e.getAttribute('data-testid') || '',
+    aria: e.getAttribute('aria-label') || '',
+    name: e.getAttribute('name') || '',
+    placeholder: e.getAttribute('placeholder') || '',
+    type: e.getAttribute('type') || '',
+    role: e.getAttribute('role') || '',
+    href: e.getAttribute('href') || '',
+    visible: !!(e.offsetWidth || e.offsetHeight || e.getClientRects().length),
+}))"""
+
+def describe(page, selector, limit):
+    """Attributes of the first `limit` matches, fetched in one round-trip instead of one per attribute."""
+    return page.locator(selector).evaluate_all(DESCRIBE_JS, limit)
+
+# Let the dev server build /search while the browser starts
+warm_up("http://localhost:3000/search")
+
+with playwright_session() as p, flow_context(p, viewport={"width": 1280, "height": 900}) as context:
+    page = context.new_page()
 
     # Navigate to search page
     print("Navigating to /search...")
-    page.goto("http://localhost:3000/search", wait_until="networkidle", timeout=30000)
-    page.wait_for_timeout(2000)
+    # Map tiles and analytics keep the network busy, so networkidle tends to run to its
+    # timeout; the results (cards, or the empty state) are what the recon actually needs
+    page.goto("http://localhost:3000/search", wait_until="commit", timeout=30000)
+    if not wait_for_search_results(page):
+        print("  Search results did not render within 10s")
 
     # Screenshot the initial state
-    page.screenshot(path=f"{SCREENSHOTS_DIR}/search_initial.png", full_page=False)
-    print(f"Screenshot saved: {SCREENSHOTS_DIR}/search_initial.png")
+    snap(page, "search_initial")
 
     # Collect all interactive elements
     print("\n=== BUTTONS ===")
-    buttons = page.locator("button").all()
-    for i, btn in enumerate(buttons[:20]):
-        text = btn.text_content().strip()[:80] if btn.text_content() else ""
-        testid = btn.get_attribute("data-testid") or ""
-        aria = btn.get_attribute("aria-label") or ""
-        visible = btn.is_visible()
-        print(f"  [{i}] text='{text}' testid='{testid}' aria='{aria}' visible={visible}")
+    for i, d in enumerate(describe(page, "button", 20)):
+        print(f"  [{i}] text='{d['text'][:80]}' testid='{d['testid']}' aria='{d['aria']}' visible={d['visible']}")
 
     print("\n=== INPUTS ===")
-    inputs = page.locator("input").all()
-    for i, inp in enumerate(inputs[:20]):
-        name = inp.get_attribute("name") or ""
-        placeholder = inp.get_attribute("placeholder") or ""
-        inp_type = inp.get_attribute("type") or ""
-        testid = inp.get_attribute("data-testid") or ""
-        visible = inp.is_visible()
-        print(f"  [{i}] name='{name}' placeholder='{placeholder}' type='{inp_type}' testid='{testid}' visible={visible}")
+    for i, d in enumerate(describe(page, "input", 20)):
+        print(f"  [{i}] name='{d['name']}' placeholder='{d['placeholder']}' type='{d['type']}' testid='{d['testid']}' visible={d['visible']}")
 
     print("\n=== SELECT / DROPDOWN ===")
-    selects = page.locator("select").all()
-    for i, sel in enumerate(selects[:10]):
-        name = sel.get_attribute("name") or ""
-        testid = sel.get_attribute("data-testid") or ""
-        print(f"  [{i}] name='{name}' testid='{testid}'")
+    for i, d in enumerate(describe(page, "select", 10)):
+        print(f"  [{i}] name='{d['name']}' testid='{d['testid']}'")
 
     print("\n=== LINKS (a tags) ===")
-    links = page.locator("a[href]").all()
-    for i, link in enumerate(links[:20]):
-        href = link.get_attribute("href") or ""
-        text = link.text_content().strip()[:60] if link.text_content() else ""
-        visible = link.is_visible()
-        if visible:
-            print(f"  [{i}] href='{href}' text='{text}'")
+    for i, d in enumerate(describe(page, "a[href]", 20)):
+        if d["visible"]:
+            print(f"  [{i}] href='{d['href']}' text='{d['text'][:60]}'")
 
     print("\n=== DATA-TESTID ELEMENTS ===")
-    testid_els = page.locator("[data-testid]").all()
-    for i, el in enumerate(testid_els[:30]):
-        testid = el.get_attribute("data-testid") or ""
-        tag = el.evaluate("e => e.tagName")
-        visible = el.is_visible()
-        print(f"  [{i}] testid='{testid}' tag='{tag}' visible={visible}")
+    for i, d in enumerate(describe(page, "[data-testid]", 30)):
+        print(f"  [{i}] testid='{d['testid']}' tag='{d['tag']}' visible={d['visible']}")
 
     print("\n=== SEARCH/LOCATION INPUT AREA ===")
     # Look for location-related inputs
-    loc_inputs = page.locator("[placeholder*='earch'], [placeholder*='ocation'], [placeholder*='ity'], [placeholder*='here'], [aria-label*='earch'], [aria-label*='ocation']").all()
-    for i, el in enumerate(loc_inputs[:10]):
-        placeholder = el.get_attribute("placeholder") or ""
-        aria = el.get_attribute("aria-label") or ""
-        role = el.get_attribute("role") or ""
-        tag = el.evaluate("e => e.tagName")
-        print(f"  [{i}] tag='{tag}' placeholder='{placeholder}' aria='{aria}' role='{role}'")
+    loc_selector = "[placeholder*='earch'], [placeholder*='ocation'], [placeholder*='ity'], [placeholder*='here'], [aria-label*='earch'], [aria-label*='ocation']"
+    for i, d in enumerate(describe(page, loc_selector, 10)):
+        print(f"  [{i}] tag='{d['tag']}' placeholder='{d['placeholder']}' aria='{d['aria']}' role='{d['role']}'")
 
     # Check for filter pills / chips
     print("\n=== FILTER CHIPS/PILLS ===")
-    pills = page.locator("[class*='pill'], [class*='chip'], [class*='filter'], [class*='Filter']").all()
-    for i, el in enumerate(pills[:15]):
-        text = el.text_content().strip()[:60] if el.text_content() else ""
-        tag = el.evaluate("e => e.tagName")
-        visible = el.is_visible()
-        if visible and text:
-            print(f"  [{i}] tag='{tag}' text='{text}'")
+    pill_selector = "[class*='pill'], [class*='chip'], [class*='filter'], [class*='Filter']"
+    for i, d in enumerate(describe(page, pill_selector, 15)):
+        if d["visible"] and d["text"]:
+            print(f"  [{i}] tag='{d['tag']}' text='{d['text'][:60]}'")
 
     # Check for listing cards
     print("\n=== LISTING RESULTS ===")
-    cards = page.locator("article, [class*='ListingCard'], [class*='listing-card'], [data-listing-id]").all()
-    print(f"  Found {len(cards)} listing card elements")
-    for i, card in enumerate(cards[:5]):
-        text = card.text_content().strip()[:100] if card.text_content() else ""
-        print(f"  [{i}] text='{text[:80]}...'")
+    card_selector = "article, [class*='ListingCard'], [class*='listing-card'], [data-listing-id]"
+    print(f"  Found {page.locator(card_selector).count()} listing card elements")
+    for i, d in enumerate(describe(page, card_selector, 5)):
+        print(f"  [{i}] text='{d['text'][:80]}...'")
 
     # Check for map
     print("\n=== MAP ===")
-    map_el = page.locator("[class*='map'], [class*='Map'], canvas, .maplibregl-map").all()
-    print(f"  Found {len(map_el)} map-related elements")
+    # The map is loaded client-side after the cards; give it a chance to mount before counting
+    try:
+        page.locator(".maplibregl-map").first.wait_for(state="attached", timeout=10000)
+    except PlaywrightTimeoutError:
+        print("  Map did not mount within 10s")
+    map_count = page.locator("[class*='map'], [class*='Map'], canvas, .maplibregl-map").count()
+    print(f"  Found {map_count} map-related elements")
 
     # Check console errors
     console_errors = []
     page.on("console", lambda msg: console_errors.append(msg.text) if msg.type == "error" else None)
-    page.reload(wait_until="networkidle")
-    page.wait_for_timeout(3000)
+    # Uncaught exceptions never show up as console messages
+    page.on("pageerror", lambda exc: console_errors.append(f"Uncaught {exc.name}: {exc.message}"))
+    page.reload(wait_until="domcontentloaded")
+    wait_for_search_results(page)
+    # The cards are server-rendered; hydration and client fetch errors come after them,
+    # so let the page settle before reporting what it logged
+    wait_ready(page)
 
     print("\n=== CONSOLE ERRORS ON RELOAD ===")
     if console_errors:
-        for err in console_errors[:10]:
-            print(f"  ERROR: {err[:200]}")
+        # A reload can log the same error many times over; show each once, most frequent first
+        for err, n in Counter(e[:200] for e in console_errors).most_common(10):
+            print(f"  ERROR ({n}x): {err}")
     else:
         print("  No console errors detected")
 
@@ -114,7 +118,6 @@ with sync_playwright() as p:
     print(f"  URL: {page.url}")
 
     # Screenshot after reload
-    page.screenshot(path=f"{SCREENSHOTS_DIR}/search_after_reload.png", full_page=False)
+    snap(page, "search_after_reload")
 
-    browser.close()
     print("\nRecon complete!")
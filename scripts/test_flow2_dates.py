@@ -1,217 +1,188 @@
 """Flow 2: Test search by date range — move-in date filter."""
-from playwright.sync_api import sync_playwright
-import os, sys
+from _playwright_server import run_parallel
+from _flow_helpers import FILTER_MODAL_APPLY, apply_button, block_third_party, filters_button, safe_goto, snap, wait_for_url_param, wait_ready, wait_visible, warm_up
+import sys
 from datetime import datetime, timedelta
 
-SCREENSHOTS_DIR = "/tmp/roomshare-tests"
-os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+VIEWPORT = {"width": 1280, "height": 900}
 
-issues = []
-passes = []
+# Test dates, fixed once per run so tests on different workers agree on "today"
+TODAY = datetime.now()
+DATES = {
+    "next_month": (TODAY + timedelta(days=30)).strftime("%Y-%m-%d"),
+    "three_months": (TODAY + timedelta(days=90)).strftime("%Y-%m-%d"),
+    "past": (TODAY - timedelta(days=30)).strftime("%Y-%m-%d"),
+}
 
-def log_pass(msg):
-    passes.append(msg)
-    print(f"  PASS: {msg}")
-
-def log_issue(msg):
-    issues.append(msg)
-    print(f"  ISSUE: {msg}")
-
-# Calculate test dates
-today = datetime.now()
-next_month = today + timedelta(days=30)
-next_month_str = next_month.strftime("%Y-%m-%d")
-three_months = today + timedelta(days=90)
-three_months_str = three_months.strftime("%Y-%m-%d")
-
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page(viewport={"width": 1280, "height": 900})
-
-    console_errors = []
-    page.on("console", lambda msg: console_errors.append(msg.text) if msg.type == "error" else None)
-
-    # ========================================
-    # Test 1: Open filters modal, find move-in date
-    # ========================================
-    print("\n=== Test 1: Open filter modal and find date controls ===")
-    page.goto("http://localhost:3000/search", wait_until="networkidle", timeout=30000)
-    page.wait_for_timeout(2000)
+# ========================================
+# Test 1: Open filters modal, find move-in date
+# ========================================
+def test_filter_modal(page, flow):
+    flow.log("\n=== Test 1: Open filter modal and find date controls ===")
+    safe_goto(page, "http://localhost:3000/search")
 
     # Click the Filters button
-    filters_btn = page.locator("button[aria-label='Filters'], button:has-text('Filters')").first
-    if filters_btn.is_visible():
+    filters_btn = filters_button(page)
+    if wait_visible(filters_btn):
         filters_btn.click()
-        page.wait_for_timeout(1000)
-        log_pass("Filters button clicked")
+        wait_visible(page.locator(FILTER_MODAL_APPLY))
+        flow.log_pass("Filters button clicked")
     else:
-        log_issue("Filters button not found")
+        flow.log_issue("Filters button not found")
 
-    page.screenshot(path=f"{SCREENSHOTS_DIR}/flow2_filter_modal.png", full_page=False)
+    snap(page, "flow2_filter_modal")
 
     # Look for date input inside the filter modal
     date_input = page.locator("input[type='date']").first
     if date_input.is_visible():
-        log_pass("Date input found in filter modal")
+        flow.log_pass("Date input found in filter modal")
     else:
         # Check for date pills
-        print("  No date input visible, looking for date-related elements...")
-        date_els = page.locator("[class*='date'], [class*='Date'], [data-testid*='date']").all()
-        print(f"  Found {len(date_els)} date-related elements")
+        flow.log("  No date input visible, looking for date-related elements...")
+        # One evaluate_all instead of three round-trips per element
+        date_els = page.locator("[class*='date'], [class*='Date'], [data-testid*='date']").evaluate_all(
+            """els => els.map(e => ({
+                tag: e.tagName,
+                text: (e.textContent || '').trim().slice(0, 80),
+                visible: !!(e.offsetWidth || e.offsetHeight || e.getClientRects().length),
+            }))"""
+        )
+        flow.log(f"  Found {len(date_els)} date-related elements")
         for i, el in enumerate(date_els[:5]):
-            text = el.text_content().strip()[:80] if el.text_content() else ""
-            tag = el.evaluate("e => e.tagName")
-            visible = el.is_visible()
-            print(f"    [{i}] tag={tag} visible={visible} text='{text}'")
-
-    # ========================================
-    # Test 2: Set move-in date via URL parameter
-    # ========================================
-    print("\n=== Test 2: Set move-in date via URL param ===")
-    page.goto(f"http://localhost:3000/search?moveInDate={next_month_str}", wait_until="networkidle", timeout=30000)
-    page.wait_for_timeout(3000)
+            flow.log(f"    [{i}] tag={el['tag']} visible={el['visible']} text='{el['text']}'")
+
+# ========================================
+# Test 2: Set move-in date via URL parameter
+# ========================================
+def test_date_url_param(page, flow):
+    flow.log("\n=== Test 2: Set move-in date via URL param ===")
+    safe_goto(page, f"http://localhost:3000/search?moveInDate={DATES['next_month']}")
 
     url = page.url
     if "moveInDate" in url:
-        log_pass(f"Move-in date in URL: {url}")
+        flow.log_pass(f"Move-in date in URL: {url}")
     else:
-        log_issue(f"Move-in date not in URL after direct navigation: {url}")
+        flow.log_issue(f"Move-in date not in URL after direct navigation: {url}")
 
-    cards = page.locator("[data-testid='listing-card']").all()
-    print(f"  Cards with move-in date filter: {len(cards)}")
+    flow.log(f"  Cards with move-in date filter: {page.get_by_test_id('listing-card').count()}")
 
-    page.screenshot(path=f"{SCREENSHOTS_DIR}/flow2_date_url.png", full_page=False)
+    snap(page, "flow2_date_url")
 
-    # ========================================
-    # Test 3: Set date via filter modal interaction
-    # ========================================
-    print("\n=== Test 3: Set date via filter modal ===")
-    page.goto("http://localhost:3000/search", wait_until="networkidle", timeout=30000)
-    page.wait_for_timeout(2000)
+# ========================================
+# Test 3: Set date via filter modal interaction
+# ========================================
+def test_date_via_modal(page, flow):
+    flow.log("\n=== Test 3: Set date via filter modal ===")
+    safe_goto(page, "http://localhost:3000/search")
 
     # Open filters
-    filters_btn = page.locator("button[aria-label='Filters'], button:has-text('Filters')").first
+    filters_btn = filters_button(page)
     filters_btn.click()
-    page.wait_for_timeout(1000)
+    wait_visible(page.locator(FILTER_MODAL_APPLY))
 
     # Find and fill date input
     date_input = page.locator("input[type='date']").first
     if date_input.is_visible():
-        date_input.fill(next_month_str)
-        page.wait_for_timeout(500)
-        log_pass(f"Date input filled with {next_month_str}")
+        date_input.fill(DATES["next_month"])
+        flow.log_pass(f"Date input filled with {DATES['next_month']}")
 
         # Click Apply/Show button
-        apply_btn = page.locator("[data-testid='filter-modal-apply'], button:has-text('Show'), button:has-text('Apply')").first
+        apply_btn = apply_button(page)
         if apply_btn.is_visible():
             apply_btn.click()
-            page.wait_for_load_state("networkidle")
-            page.wait_for_timeout(3000)
+            wait_for_url_param(page, "moveInDate")
+            wait_ready(page)
 
             url = page.url
             if "moveInDate" in url:
-                log_pass(f"Date applied via modal, URL: {url}")
+                flow.log_pass(f"Date applied via modal, URL: {url}")
             else:
-                log_issue(f"Date not in URL after modal apply: {url}")
+                flow.log_issue(f"Date not in URL after modal apply: {url}")
         else:
-            log_issue("Apply button not found in filter modal")
+            flow.log_issue("Apply button not found in filter modal")
     else:
-        log_issue("Date input not visible in filter modal")
+        flow.log_issue("Date input not visible in filter modal")
 
-    page.screenshot(path=f"{SCREENSHOTS_DIR}/flow2_date_modal_applied.png", full_page=False)
+    snap(page, "flow2_date_modal_applied")
 
-    # ========================================
-    # Test 4: Date pills (if they exist)
-    # ========================================
-    print("\n=== Test 4: Check for date pills ===")
-    page.goto("http://localhost:3000/search", wait_until="networkidle", timeout=30000)
-    page.wait_for_timeout(2000)
+# ========================================
+# Test 4: Date pills (if they exist)
+# ========================================
+def test_date_pills(page, flow):
+    flow.log("\n=== Test 4: Check for date pills ===")
+    safe_goto(page, "http://localhost:3000/search")
 
     # Look for date-related pills/tabs on the search page
-    date_pills = page.locator("button:has-text('This month'), button:has-text('Next month'), button:has-text('Flexible'), [class*='DatePill']").all()
-    print(f"  Date pills found: {len(date_pills)}")
-    for dp in date_pills[:5]:
-        text = dp.text_content().strip()[:40]
-        visible = dp.is_visible()
-        print(f"    pill: '{text}' visible={visible}")
-
-    # ========================================
-    # Test 5: Past date rejection
-    # ========================================
-    print("\n=== Test 5: Past date rejection ===")
-    past_date = (today - timedelta(days=30)).strftime("%Y-%m-%d")
-    page.goto(f"http://localhost:3000/search?moveInDate={past_date}", wait_until="networkidle", timeout=30000)
-    page.wait_for_timeout(2000)
-
+    date_pills = page.locator("button:has-text('This month'), button:has-text('Next month'), button:has-text('Flexible'), [class*='DatePill']")
+    # Count, text and visibility in one evaluate_all, not two round-trips per pill
+    pills = date_pills.evaluate_all(
+        """els => els.map(e => ({
+            text: (e.textContent || '').trim().slice(0, 40),
+            visible: !!(e.offsetWidth || e.offsetHeight || e.getClientRects().length),
+        }))"""
+    )
+    flow.log(f"  Date pills found: {len(pills)}")
+    for pill in pills[:5]:
+        flow.log(f"    pill: '{pill['text']}' visible={pill['visible']}")
+
+# ========================================
+# Test 5: Past date rejection
+# ========================================
+def test_past_date_rejected(page, flow):
+    flow.log("\n=== Test 5: Past date rejection ===")
+    safe_goto(page, f"http://localhost:3000/search?moveInDate={DATES['past']}")
+
+    wait_for_url_param(page, "moveInDate", present=False)
     url = page.url
     # Past dates should be stripped from URL by validation
     if "moveInDate" not in url:
-        log_pass("Past date correctly rejected/stripped from URL")
+        flow.log_pass("Past date correctly rejected/stripped from URL")
     else:
-        log_issue(f"Past date NOT rejected - still in URL: {url}")
+        flow.log_issue(f"Past date NOT rejected - still in URL: {url}")
 
-    # ========================================
-    # Test 6: Clear date filter
-    # ========================================
-    print("\n=== Test 6: Clear date filter ===")
-    page.goto(f"http://localhost:3000/search?moveInDate={next_month_str}", wait_until="networkidle", timeout=30000)
-    page.wait_for_timeout(2000)
+# ========================================
+# Test 6: Clear date filter
+# ========================================
+def test_clear_date(page, flow):
+    flow.log("\n=== Test 6: Clear date filter ===")
+    safe_goto(page, f"http://localhost:3000/search?moveInDate={DATES['next_month']}")
 
     # Open filters and clear
-    filters_btn = page.locator("button[aria-label='Filters'], button:has-text('Filters')").first
-    if filters_btn.is_visible():
+    filters_btn = filters_button(page)
+    if wait_visible(filters_btn):
         filters_btn.click()
-        page.wait_for_timeout(1000)
+        wait_visible(page.locator(FILTER_MODAL_APPLY))
 
         # Clear the date input
         date_input = page.locator("input[type='date']").first
         if date_input.is_visible():
             date_input.fill("")
-            page.wait_for_timeout(500)
 
             # Apply
-            apply_btn = page.locator("[data-testid='filter-modal-apply'], button:has-text('Show'), button:has-text('Apply')").first
+            apply_btn = apply_button(page)
             if apply_btn.is_visible():
                 apply_btn.click()
-                page.wait_for_load_state("networkidle")
-                page.wait_for_timeout(2000)
+                wait_for_url_param(page, "moveInDate", present=False)
+                wait_ready(page)
 
                 url = page.url
                 if "moveInDate" not in url:
-                    log_pass("Date filter cleared successfully")
+                    flow.log_pass("Date filter cleared successfully")
                 else:
-                    log_issue(f"Date filter not cleared: {url}")
-
-    # ========================================
-    # Console errors
-    # ========================================
-    print("\n=== Console Errors ===")
-    # Filter out known Photon timeout errors
-    real_errors = [e for e in console_errors if "photon.komoot" not in e.lower()]
-    if real_errors:
-        for err in real_errors[:10]:
-            log_issue(f"Console error: {err[:200]}")
-    else:
-        log_pass("No unexpected console errors")
-
-    # ========================================
-    # Summary
-    # ========================================
-    print("\n" + "=" * 50)
-    print("FLOW 2 SUMMARY: Search by Date Range")
-    print("=" * 50)
-    print(f"PASSES: {len(passes)}")
-    for p_msg in passes:
-        print(f"  ✅ {p_msg}")
-    print(f"ISSUES: {len(issues)}")
-    for i_msg in issues:
-        print(f"  ❌ {i_msg}")
-
-    browser.close()
-
-    if issues:
-        print("\nFLOW 2: ISSUES FOUND")
-        sys.exit(1)
-    else:
-        print("\nFLOW 2: ALL PASSED")
-        sys.exit(0)
+                    flow.log_issue(f"Date filter not cleared: {url}")
+
+TESTS = [
+    test_filter_modal,
+    test_date_url_param,
+    test_date_via_modal,
+    test_date_pills,
+    test_past_date_rejected,
+    test_clear_date,
+]
+
+if __name__ == "__main__":
+    # Let the dev server build /search while the browser starts
+    warm_up("http://localhost:3000/search")
+    flow = run_parallel(TESTS, page_setup=block_third_party, viewport=VIEWPORT)
+    flow.check_console()
+    sys.exit(flow.finish("FLOW 2", "Search by Date Range"))
@@ -1,15 +1,24 @@
 """Check if onSlideClick fires by monitoring console output."""
-from playwright.sync_api import sync_playwright
+from _playwright_server import flow_context, playwright_session
+from _flow_helpers import block_third_party, wait_for_url_contains, wait_ready, warm_up
+import re
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page(viewport={"width": 1280, "height": 900})
+KEYWORDS_RE = re.compile(r"route|slide|drag|click|pointer|navigate", re.IGNORECASE)
 
+# Let the dev server build /search while the browser starts
+warm_up("http://localhost:3000/search")
+
+# A fresh context per run: isolated cookies/storage without a new browser process
+with playwright_session() as p, flow_context(p, viewport={"width": 1280, "height": 900}) as context:
+    page = context.new_page()
+    block_third_party(page)
+
+    # Only the navigation-related messages are ever printed, so keep just those
     console_msgs = []
-    page.on("console", lambda msg: console_msgs.append(msg.text))
+    page.on("console", lambda msg: console_msgs.append(msg.text) if KEYWORDS_RE.search(msg.text) else None)
 
-    page.goto("http://localhost:3000/search", wait_until="domcontentloaded", timeout=30000)
-    page.wait_for_timeout(5000)
+    page.goto("http://localhost:3000/search", wait_until="commit")
+    wait_ready(page)
 
     # Inject debug logging into the first carousel's Embla event handlers
     page.evaluate("""() => {
@@ -32,41 +41,36 @@ with sync_playwright() as p:
     href = link.get_attribute("href")
     print(f"Clicking link with href={href}")
     link.click()
-    page.wait_for_timeout(5000)
+    wait_for_url_contains(page, "/listings/")
 
     print(f"URL after click: {page.url}")
     print(f"\nConsole messages with 'ROUTE' or 'slide' or 'drag':")
     for msg in console_msgs:
-        if any(kw in msg.lower() for kw in ['route', 'slide', 'drag', 'click', 'pointer', 'navigate']):
-            print(f"  {msg[:200]}")
+        print(f"  {msg[:200]}")
 
     # Try clicking on a listing that has a SINGLE image (no carousel)
     print("\n--- Check which listings have multiple images ---")
-    page.goto("http://localhost:3000/search", wait_until="domcontentloaded", timeout=30000)
-    page.wait_for_timeout(5000)
+    page.goto("http://localhost:3000/search", wait_until="commit")
+    wait_ready(page)
 
-    # Count images per card
-    cards = page.locator("[data-testid='listing-card']").all()
-    for i, card in enumerate(cards[:5]):
-        images = card.locator("img").all()
-        dots = card.locator("[role='tablist']").all()
-        has_carousel = len(dots) > 0
-        link_el = card.locator("a[href*='/listings/']")
-        href_val = link_el.get_attribute("href") if link_el.count() > 0 else "none"
-        print(f"  Card {i}: {len(images)} images, carousel={has_carousel}, href={href_val}")
+    # Count images per card: one evaluate_all for every card instead of ~5 calls per card
+    cards = page.locator("[data-testid='listing-card']")
+    meta = cards.evaluate_all("""els => els.map(c => ({
+        images: c.querySelectorAll('img').length,
+        hasCarousel: !!c.querySelector("[role='tablist']"),
+        href: c.querySelector("a[href*='/listings/']")?.getAttribute('href') ?? null,
+    }))""")
+    for i, m in enumerate(meta[:5]):
+        print(f"  Card {i}: {m['images']} images, carousel={m['hasCarousel']}, href={m['href'] or 'none'}")
 
     # Find a card without a carousel (single image) and click it
-    for i, card in enumerate(cards[:10]):
-        dots = card.locator("[role='tablist']")
-        if dots.count() == 0:
+    for i, m in enumerate(meta[:10]):
+        if not m["hasCarousel"]:
             print(f"\n--- Clicking card {i} (no carousel) ---")
-            card_link = card.locator("a[href*='/listings/']")
-            if card_link.count() > 0:
-                href_val = card_link.get_attribute("href")
-                print(f"  href={href_val}")
-                card_link.click()
-                page.wait_for_timeout(5000)
+            if m["href"]:
+                print(f"  href={m['href']}")
+                cards.nth(i).locator("a[href*='/listings/']").first.click()
+                wait_for_url_contains(page, "/listings/")
                 print(f"  URL: {page.url}")
                 break
 
-    browser.close()
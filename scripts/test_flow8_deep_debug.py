@@ -1,18 +1,14 @@
 """Deep debug: trace exactly what happens when clicking a listing card image."""
-from playwright.sync_api import sync_playwright
+from _playwright_server import flow_context, playwright_session
+from _flow_helpers import LISTING_LINK, block_heavy_assets, local_timeouts, wait_for_url_contains, wait_visible, warm_up
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page(viewport={"width": 1280, "height": 900})
-
-    page.goto("http://localhost:3000/search", wait_until="domcontentloaded", timeout=30000)
-    page.wait_for_timeout(5000)
-
-    # Inject click event tracing on the first listing link
-    page.evaluate("""() => {
-        const link = document.querySelector("a[href*='/listings/']");
-        if (!link) { console.log('DEBUG: No listing link found'); return; }
+# Click event tracing for the first listing link on /search. As an init script it is
+# installed on every page load, before the app's own JS, so each /search visit below
+# is traced without an explicit evaluate after its goto.
+TRACE_LISTING_CLICKS_JS = """(() => {
+    if (!location.pathname.startsWith('/search')) return;
 
+    const instrument = (link) => {
         const href = link.getAttribute('href');
         console.log('DEBUG: Found link with href=' + href);
 
@@ -37,50 +33,83 @@ with sync_playwright() as p:
         } else {
             console.log('DEBUG: No Embla viewport found');
         }
+    };
 
-        // Trace on document
-        document.addEventListener('click', (e) => {
-            console.log('DEBUG: Document click (target=' + e.target.tagName + ', defaultPrevented=' + e.defaultPrevented + ')');
-        }, true);
-    }""")
+    // Trace on document
+    document.addEventListener('click', (e) => {
+        console.log('DEBUG: Document click (target=' + e.target.tagName + ', defaultPrevented=' + e.defaultPrevented + ')');
+    }, true);
 
-    # Also listen to console
-    console_msgs = []
-    page.on("console", lambda msg: console_msgs.append(msg.text) if "DEBUG:" in msg.text else None)
+    // The cards may render after DOMContentLoaded, so watch for the first link
+    document.addEventListener('DOMContentLoaded', () => {
+        const find = () => document.querySelector("a[href*='/listings/']");
+        const link = find();
+        if (link) { instrument(link); return; }
+        const observer = new MutationObserver(() => {
+            const found = find();
+            if (found) { observer.disconnect(); instrument(found); }
+        });
+        observer.observe(document.body, { childList: true, subtree: true });
+    });
+})()"""
 
-    # Now click the link (default center position = image area)
-    link = page.locator("a[href*='/listings/']").first
-    href = link.get_attribute("href")
-    print(f"Clicking link with href={href}")
+# href and viewport box of a link in one round-trip (what bounding_box() reports for
+# an element in the main frame)
+LINK_BOX_JS = """a => {
+    const r = a.getBoundingClientRect();
+    return {href: a.getAttribute('href'), x: r.x, y: r.y, width: r.width, height: r.height};
+}"""
 
-    # Get the bounding box to see where the click lands
-    box = link.bounding_box()
-    if box:
-        print(f"  Link box: x={box['x']:.0f} y={box['y']:.0f} w={box['width']:.0f} h={box['height']:.0f}")
-        print(f"  Click center: ({box['x'] + box['width']/2:.0f}, {box['y'] + box['height']/2:.0f})")
+def probe(page, console_msgs, y_frac=None):
+    """Load /search, click the first listing link and report where it went.
 
-    link.click()
-    page.wait_for_timeout(3000)
+    y_frac=None uses Playwright's default click (the centre, over the image);
+    otherwise the click lands that fraction of the way down the link's box.
+    Returns True if the click reached a listing page.
+    """
+    console_msgs.clear()
+    page.goto("http://localhost:3000/search", wait_until="commit")
+    link = page.locator(LISTING_LINK).first
+    wait_visible(link, 8000)
+    box = link.evaluate(LINK_BOX_JS)
+    print(f"Clicking link with href={box['href']}")
+
+    # The bounding box shows where the click lands
+    if box["width"] and box["height"]:
+        print(f"  Link box: x={box['x']:.0f} y={box['y']:.0f} w={box['width']:.0f} h={box['height']:.0f}")
+    if y_frac is None:
+        if box["width"] and box["height"]:
+            print(f"  Click center: ({box['x'] + box['width']/2:.0f}, {box['y'] + box['height']/2:.0f})")
+        link.click()
+    else:
+        x = box["x"] + box["width"] / 2
+        y = box["y"] + box["height"] * y_frac
+        print(f"  Clicking at ({x:.0f}, {y:.0f})")
+        page.mouse.click(x, y)
+    wait_for_url_contains(page, "/listings/", 3000)
 
     print(f"\nURL after click: {page.url}")
     print(f"\nConsole trace ({len(console_msgs)} messages):")
     for msg in console_msgs:
         print(f"  {msg}")
+    return "/listings/" in page.url
 
-    # Now try clicking specifically on the content area (bottom of card)
-    print("\n--- Clicking on content area ---")
-    page.goto("http://localhost:3000/search", wait_until="domcontentloaded", timeout=30000)
-    page.wait_for_timeout(5000)
+# Let the dev server build /search while the browser starts
+warm_up("http://localhost:3000/search")
 
-    link = page.locator("a[href*='/listings/']").first
-    box = link.bounding_box()
-    if box:
-        # Click at bottom 25% of the card (content area, below image)
-        content_x = box['x'] + box['width'] / 2
-        content_y = box['y'] + box['height'] * 0.85
-        print(f"  Clicking at ({content_x:.0f}, {content_y:.0f}) — bottom of card")
-        page.mouse.click(content_x, content_y)
-        page.wait_for_timeout(3000)
-        print(f"  URL: {page.url}")
+with playwright_session() as p, flow_context(p, viewport={"width": 1280, "height": 900}) as context:
+    context.add_init_script(TRACE_LISTING_CLICKS_JS)
+    page = context.new_page()
+    block_heavy_assets(page)
+    local_timeouts(page)
+
+    console_msgs = []
+    page.on("console", lambda msg: console_msgs.append(msg.text) if "DEBUG:" in msg.text else None)
 
-    browser.close()
+    # Click the link at its default center position (the image area)
+    if probe(page, console_msgs):
+        print("\nDefault click navigated; skipping the content-area click")
+    else:
+        # Click at bottom 25% of the card (content area, below image)
+        print("\n--- Clicking on content area ---")
+        probe(page, console_msgs, y_frac=0.85)
@@ -1,9 +1,6 @@
 """Flow 8 fix: Test listing click navigation with proper Next.js handling."""
-from playwright.sync_api import sync_playwright
-import os
-
-SCREENSHOTS_DIR = "/tmp/roomshare-tests"
-os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+from _playwright_server import flow_context, playwright_session
+from _flow_helpers import LISTING_LINK, block_heavy_assets, local_timeouts, snap, wait_for_url_contains, wait_ready, wait_visible, warm_up
 
 issues = []
 passes = []
@@ -16,12 +13,16 @@ def log_issue(msg):
     issues.append(msg)
     print(f"  ISSUE: {msg}")
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page(viewport={"width": 1280, "height": 900})
+# Let the dev server build /search while the browser starts
+warm_up("http://localhost:3000/search")
+
+with playwright_session() as p, flow_context(p, viewport={"width": 1280, "height": 900}) as context:
+    page = context.new_page()
+    block_heavy_assets(page)
+    local_timeouts(page)
 
-    page.goto("http://localhost:3000/search", wait_until="domcontentloaded", timeout=30000)
-    page.wait_for_timeout(5000)
+    page.goto("http://localhost:3000/search", wait_until="commit")
+    wait_visible(page.locator(LISTING_LINK).first, 8000)
 
     # Debug: examine the listing card structure
     print("=== Listing Card Structure ===")
@@ -30,23 +31,23 @@ with sync_playwright() as p:
         html = first_card.evaluate("el => el.outerHTML.substring(0, 500)")
         print(f"  First card HTML: {html[:300]}...")
 
-        # Get all links in the card
-        card_links = first_card.locator("a").all()
+        # Get all links in the card, read in one evaluate_all
+        card_links = first_card.locator("a").evaluate_all(
+            "els => els.map(a => ({href: a.getAttribute('href') || '', text: (a.textContent || '').trim().slice(0, 50)}))"
+        )
         print(f"  Links inside card: {len(card_links)}")
         for i, link in enumerate(card_links[:5]):
-            href = link.get_attribute("href") or ""
-            text = link.text_content().strip()[:50] if link.text_content() else ""
-            print(f"    [{i}] href='{href}' text='{text}'")
+            print(f"    [{i}] href='{link['href']}' text='{link['text']}'")
 
     # Try clicking the listing link with different approach
     print("\n=== Approach 1: Click listing link directly ===")
-    listing_link = page.locator("a[href*='/listings/']").first
+    listing_link = page.locator(LISTING_LINK).first
     href = listing_link.get_attribute("href")
     print(f"  Link href: {href}")
 
     # Use expect_navigation pattern
     try:
-        with page.expect_navigation(timeout=10000):
+        with page.expect_navigation(timeout=5000):
             listing_link.click()
         print(f"  URL after click: {page.url}")
         if "/listings/" in page.url:
@@ -55,31 +56,29 @@ with sync_playwright() as p:
             log_issue(f"Wrong URL: {page.url}")
     except Exception as e:
         print(f"  Navigation not detected: {e}")
-        # Wait longer and check
-        page.wait_for_timeout(5000)
+        # Give a slow client-side navigation a little longer
+        wait_for_url_contains(page, "/listings/", 5000)
         print(f"  URL after wait: {page.url}")
 
-    # Back to search
-    page.go_back()
-    page.wait_for_timeout(3000)
+    # Back to search; approach 2 reloads /search itself, so don't wait for this load
+    page.go_back(wait_until="commit")
 
     print("\n=== Approach 2: Click and wait for URL change ===")
-    page.goto("http://localhost:3000/search", wait_until="domcontentloaded", timeout=30000)
-    page.wait_for_timeout(5000)
-
-    listing_link = page.locator("a[href*='/listings/']").first
+    page.goto("http://localhost:3000/search", wait_until="commit")
+    listing_link = page.locator(LISTING_LINK).first
+    wait_visible(listing_link, 8000)
     href = listing_link.get_attribute("href")
     print(f"  Link href: {href}")
 
     listing_link.click()
     # Wait for URL to change
     try:
-        page.wait_for_url("**/listings/**", timeout=10000)
+        page.wait_for_url("**/listings/**", timeout=5000)
         print(f"  URL after wait: {page.url}")
         log_pass(f"Approach 2 worked: {page.url}")
     except Exception:
-        page.wait_for_timeout(5000)
-        print(f"  URL after 5s wait: {page.url}")
+        wait_for_url_contains(page, "/listings/", 5000)
+        print(f"  URL after up to 5s more: {page.url}")
         if "/listings/" in page.url:
             log_pass(f"Approach 2 slow nav: {page.url}")
         else:
@@ -90,36 +89,41 @@ with sync_playwright() as p:
                 print(f"    {pg.url}")
 
     print("\n=== Approach 3: Direct navigation ===")
-    page.goto(f"http://localhost:3000{href}", wait_until="domcontentloaded", timeout=30000)
-    page.wait_for_timeout(5000)
+    page.goto(f"http://localhost:3000{href}", wait_until="commit")
     print(f"  Direct nav URL: {page.url}")
     if "/listings/" in page.url:
         log_pass(f"Direct navigation works: {page.url}")
 
         # Check page content
         title = page.locator("h1").first
-        if title.is_visible():
+        if wait_visible(title):
             print(f"  Page title: '{title.text_content().strip()[:60]}'")
             log_pass("Listing detail page renders correctly")
 
-        page.screenshot(path=f"{SCREENSHOTS_DIR}/flow8_direct_detail.png", full_page=False)
+        snap(page, "flow8_direct_detail")
     else:
         log_issue("Direct navigation also failed")
+        # A failure is worth a picture whether or not SCREENSHOTS=1
+        snap(page, "flow8_direct_detail_failed", always=True)
 
     # Check for touch targets on mobile
     print("\n=== Touch Target Debug ===")
-    page.goto("http://localhost:3000/search", wait_until="domcontentloaded", timeout=30000)
-    page.wait_for_timeout(4000)
+    page.goto("http://localhost:3000/search", wait_until="commit")
+    wait_visible(page.locator(LISTING_LINK).first, 8000)
     page.set_viewport_size({"width": 375, "height": 812})
-    page.wait_for_timeout(2000)
-
-    buttons = page.locator("button:visible").all()
-    for btn in buttons[:20]:
-        box = btn.bounding_box()
-        text = btn.text_content().strip()[:30] if btn.text_content() else "?"
-        aria = btn.get_attribute("aria-label") or ""
-        if box and (box["width"] < 44 or box["height"] < 44):
-            print(f"  SMALL: {box['width']:.0f}x{box['height']:.0f} text='{text}' aria='{aria}'")
+    # The mobile layout swaps in on resize and may fetch; let it settle
+    wait_ready(page, idle_ms=300)
+
+    # Size, label and text of the first 20 visible buttons in one round-trip
+    buttons = page.locator("button:visible").evaluate_all(
+        """els => els.slice(0, 20).map(b => {
+            const r = b.getBoundingClientRect();
+            return {w: r.width, h: r.height, text: (b.textContent || '').trim().slice(0, 30) || '?', aria: b.getAttribute('aria-label') || ''};
+        })"""
+    )
+    for btn in buttons:
+        if btn["w"] < 44 or btn["h"] < 44:
+            print(f"  SMALL: {btn['w']:.0f}x{btn['h']:.0f} text='{btn['text']}' aria='{btn['aria']}'")
 
     # Summary
     print(f"\n  PASSES: {len(passes)} | ISSUES: {len(issues)}")
@@ -128,4 +132,3 @@ with sync_playwright() as p:
     for i_msg in issues:
         print(f"  ❌ {i_msg}")
 
-    browser.close()
@@ -477,7 +477,10 @@ function ContactFirstSidebarCard({
     <div className="bg-surface-container-lowest rounded-3xl shadow-ambient-lg p-6">
       <div className="flex justify-between items-end mb-6">
         <div>
-          <span className="text-3xl font-bold text-on-surface">
+          <span
+            data-testid="listing-detail-price"
+            className="text-3xl font-bold text-on-surface"
+          >
             {formatPrice(price)}
           </span>
           <span className="text-on-surface-variant"> / month</span>
@@ -1459,7 +1462,10 @@ export default function ListingPageClient({
 
                     {/* Price */}
                     <div className="mb-6 text-center">
-                      <span className="text-2xl font-bold font-display text-on-surface">
+                      <span
+                        data-testid="listing-detail-price"
+                        className="text-2xl font-bold font-display text-on-surface"
+                      >
                         {formatPrice(listing.price ?? 0)}
                       </span>
                       <span className="text-sm text-on-surface-variant">
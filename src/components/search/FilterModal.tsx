@@ -434,6 +434,7 @@ export function FilterModal({
                             type="button"
                             variant="filter"
                             onClick={() => !isZero && onToggleAmenity(amenity)}
+                            data-testid={`amenity-${amenity}`}
                             data-active={isActive}
                             aria-pressed={isActive}
                             aria-disabled={isZero}
@@ -475,6 +476,7 @@ export function FilterModal({
                             type="button"
                             variant="filter"
                             onClick={() => !isZero && onToggleHouseRule(rule)}
+                            data-testid={`house-rule-${rule}`}
                             data-active={isActive}
                             aria-pressed={isActive}
                             aria-disabled={isZero}